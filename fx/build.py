@@ -14,9 +14,10 @@
 
 """Build module for generating static API site files."""
 
-import datetime
-import re
+import logging
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
@@ -26,44 +27,148 @@ from fx.quote import (
     write_latest_quote_site,
     write_year_quotes_site,
 )
+from fx.utils import clear_dir_cache
 
 if TYPE_CHECKING:
-    from fx.v1.quote_pb2 import Quote, QuoteList  # type: ignore[attr-defined]
+    from collections.abc import Callable, Iterable, Iterator
+
+    from fx.v1.quote_pb2 import Quote  # type: ignore[attr-defined]
+
+_CURRENCY_CODE_LEN = 3
+
+# Data files are named after the year they contain e.g. "2025.binpb".
+_DATA_FILE_SUFFIX = ".binpb"
+_DATA_FILE_NAME_LEN = 4 + len(_DATA_FILE_SUFFIX)
+
+
+def _is_currency_code(name: str) -> bool:
+    """Return whether name looks like an alphabetic currency code."""
+    return len(name) == _CURRENCY_CODE_LEN and name.isascii() and name.isalpha()
+
+
+def _is_data_file_name(name: str) -> bool:
+    """Return whether name looks like a yearly data file name."""
+    return (
+        len(name) == _DATA_FILE_NAME_LEN
+        and name.endswith(_DATA_FILE_SUFFIX)
+        and name[:4].isascii()
+        and name[:4].isdigit()
+    )
+
+
+def _scan_dirs(
+    path: str,
+    predicate: Callable[[str], bool],
+) -> Iterator[os.DirEntry[str]]:
+    """Yield the subdirectories of path whose names match predicate."""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False) and predicate(entry.name):
+                yield entry
+
+
+def iter_data_files(
+    provider_data_path: str | Path,
+) -> Iterator[tuple[str, str, int, str]]:
+    """
+    Iterate over the quote data files for a provider.
+
+    The data directory has a fixed layout of the form
+    <base currency>/<quote currency>/<year>.binpb so it is traversed at known
+    depths. Yields tuples of the form (base currency code, quote currency code,
+    year, file path).
+    """
+    if not Path(provider_data_path).is_dir():
+        return
+
+    for base_entry in _scan_dirs(str(provider_data_path), _is_currency_code):
+        for quote_entry in _scan_dirs(base_entry.path, _is_currency_code):
+            with os.scandir(quote_entry.path) as it:
+                for entry in it:
+                    if _is_data_file_name(entry.name) and entry.is_file():
+                        yield (
+                            base_entry.name,
+                            quote_entry.name,
+                            int(entry.name[:4]),
+                            entry.path,
+                        )
 
 
 def update_latest_quotes(
     latest_quotes: dict[tuple[str, str, str], Quote],
     provider_code: str,
-    quotelist: QuoteList,
+    quotes: Iterable[Quote],
 ) -> None:
     """
-    Update the given latest_quotes dictionary with quotes from quotelist.
+    Update the given latest_quotes dictionary with the given quotes.
 
     Updates the given latest_quotes dictionary with the
-    quotes from the given quotelist.
+    quotes from the given iterable of quotes.
     """
-    for quote in quotelist.quotes:
+    for quote in quotes:
         pair = (provider_code, quote.base_currency_code, quote.quote_currency_code)
-        if pair not in latest_quotes:
+        existing_quote = latest_quotes.get(pair)
+        if existing_quote is None:
+            latest_quotes[pair] = quote
+            continue
+
+        # Compare dates as integers of the form YYYYMMDD.
+        d = quote.date
+        ed = existing_quote.date
+        if d.year * 10000 + d.month * 100 + d.day > (
+            ed.year * 10000 + ed.month * 100 + ed.day
+        ):
             latest_quotes[pair] = quote
-        else:
-            existing_quote = latest_quotes[pair]
-            if datetime.date(
-                quote.date.year,
-                quote.date.month,
-                quote.date.day,
-            ) > datetime.date(
-                existing_quote.date.year,
-                existing_quote.date.month,
-                existing_quote.date.day,
-            ):
-                latest_quotes[pair] = quote
+
+
+def _init_worker(logger_name: str, level: int) -> None:
+    """Initialize logging for build worker processes."""
+    logging.basicConfig()
+    logging.getLogger(logger_name).setLevel(level)
+
+
+def _build_year_site(  # noqa: PLR0913
+    *,
+    base_dir: Path,
+    base_currency_code: str,
+    quote_currency_code: str,
+    year: int,
+    file_path: str,
+    logger: logging.Logger,
+) -> Quote | None:
+    """
+    Build the API files for a year's worth of quotes.
+
+    This is run in a worker process. It returns the latest quote in the data
+    file, or None if the file is empty, so that the caller can determine the
+    overall latest quote for the currency pair.
+    """
+    logger.info(
+        "building %s/%s for %s...",
+        base_currency_code,
+        quote_currency_code,
+        year,
+    )
+
+    quotelist = read_quotelist_data(file_path, logger)
+
+    write_year_quotes_site(base_dir, year, quotelist, logger)
+
+    # Each data file holds a single currency pair and write_quotes_data keeps
+    # its quotes sorted by date so the last quote is the latest.
+    if not quotelist.quotes:
+        return None
+    return quotelist.quotes[-1]
 
 
 def build_command(args: Any) -> None:  # noqa: ANN401
     """build_command implements the fx build command."""
     args.logger.debug("running build")
 
+    # The site directory may have been changed since a previous run in this
+    # process. Worker processes start with their own empty cache.
+    clear_dir_cache()
+
     site_dir_v1 = Path(args.site_dir).joinpath("v1")
 
     write_providers_site(site_dir_v1, args.provider, args.logger)
@@ -71,42 +176,46 @@ def build_command(args: Any) -> None:  # noqa: ANN401
     latest_quotes: dict[tuple[str, str, str], Quote] = {}
 
     build_start = time.time()
-    for provider in args.provider:
-        provider_data_path = Path(args.data_dir).joinpath(provider.code)
-        for root, _dirs, files in provider_data_path.walk():
-            for filename in files:
-                file_path = Path(root).joinpath(filename)
-                match = re.match(
-                    r"^"
-                    + re.escape(str(provider_data_path))
-                    + r"/([a-zA-Z]{3})/([a-zA-Z]{3})/([0-9]{4}).binpb$",
-                    str(file_path),
-                )
-                if match:
-                    base_currency_code = match.group(1)
-                    quote_currency_code = match.group(2)
-                    year = int(match.group(3))
-
-                    args.logger.info(
-                        "building %s/%s for %s...",
-                        base_currency_code,
-                        quote_currency_code,
-                        year,
-                    )
-
-                    quotelist = read_quotelist_data(str(file_path), args.logger)
 
-                    update_latest_quotes(latest_quotes, provider.code, quotelist)
-
-                    base_dir = site_dir_v1.joinpath(
+    # Each data file is independent so they are built in parallel across
+    # worker processes. Only the latest quote from each file is sent back to
+    # be merged.
+    with ProcessPoolExecutor(
+        initializer=_init_worker,
+        initargs=(args.logger.name, args.logger.getEffectiveLevel()),
+    ) as executor:
+        futures = [
+            (
+                provider.code,
+                executor.submit(
+                    _build_year_site,
+                    base_dir=site_dir_v1.joinpath(
                         "provider",
                         provider.code,
                         "quote",
                         base_currency_code,
                         quote_currency_code,
-                    )
-
-                    write_year_quotes_site(base_dir, year, quotelist, args.logger)
+                    ),
+                    base_currency_code=base_currency_code,
+                    quote_currency_code=quote_currency_code,
+                    year=year,
+                    file_path=file_path,
+                    logger=args.logger,
+                ),
+            )
+            for provider in args.provider
+            for (
+                base_currency_code,
+                quote_currency_code,
+                year,
+                file_path,
+            ) in iter_data_files(Path(args.data_dir).joinpath(provider.code))
+        ]
+
+        for provider_code, future in futures:
+            quote = future.result()
+            if quote is not None:
+                update_latest_quotes(latest_quotes, provider_code, [quote])
 
     # Write the latest quotes for each currency pair.
     for (
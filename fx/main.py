@@ -18,6 +18,8 @@ import argparse
 import datetime
 import logging
 
+from google.protobuf.internal import api_implementation
+
 from fx.build import build_command
 from fx.mufg import MUFGProvider
 from fx.update import update_command
@@ -55,6 +57,14 @@ def main() -> None:
         choices = ", ".join(sorted(repr(choice) for choice in provider_map))
         raise argparse.ArgumentTypeError(msg.format(arg, choices))
 
+    def positive_int(arg: str) -> int:
+        """Convert an argument to an integer that is at least 1."""
+        value = int(arg)
+        if value < 1:
+            msg = f"invalid value: {arg!r} (must be at least 1)"
+            raise argparse.ArgumentTypeError(msg)
+        return value
+
     update = subparsers.add_parser("update", help="Update currency exchange data")
     update.add_argument(
         "--provider",
@@ -96,6 +106,20 @@ def main() -> None:
         type=int,
         default=0.5,
     )
+    update.add_argument(
+        "--workers",
+        help="maximum number of concurrent requests to each provider",
+        type=positive_int,
+        default=8,
+    )
+    # Provider pages for past dates don't change so they can optionally be
+    # cached on disk to avoid downloading them again on later runs.
+    update.add_argument(
+        "--cache-dir",
+        help="directory to cache downloaded provider pages in",
+        type=str,
+        default=None,
+    )
     update.set_defaults(func=update_command, logger=logger)
 
     build = subparsers.add_parser("build", help="Build static API files")
@@ -114,6 +138,16 @@ def main() -> None:
     if args.debug:
         logger.setLevel(logging.DEBUG)
 
+    # The native (upb) protobuf implementation is the default but the pure
+    # Python implementation can be selected silently, e.g. via the
+    # PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION environment variable. It is
+    # orders of magnitude slower at parsing and serializing quote data.
+    if api_implementation.Type() == "python":
+        logger.warning(
+            "using the pure Python protobuf implementation; "
+            "this will be significantly slower",
+        )
+
     args.func(args)
 
 
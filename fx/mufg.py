@@ -14,17 +14,38 @@
 
 """MUFG Bank exchange rate provider implementation."""
 
-from typing import TYPE_CHECKING, Any, ClassVar
+import datetime
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, ClassVar
 
 import urllib3
-from bs4 import BeautifulSoup
 from google.type.date_pb2 import Date
+from lxml import etree, html
 
 from fx.utils import str_to_money
 from fx.v1.quote_pb2 import Quote  # type: ignore[attr-defined]
 
-if TYPE_CHECKING:
-    import datetime
+# An XML declaration at the start of a page. lxml rejects str input that has an
+# encoding declaration so it is removed from the decoded page.
+_XML_DECLARATION_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+# Compiled XPath expressions are shared by all pages and threads.
+
+# The quote table on the MUFG page.
+_TABLE_XPATH = etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' data-table5 ')]",
+)
+
+# The base currency code, TTS, TTB, and TTM cells in each row of the quote
+# table. The first two cells of each row, the quote currency and the base
+# currency's Japanese name, are not used so they are skipped by the XPath
+# query. XPath positions are 1-based.
+_CELLS_XPATH = etree.XPath(".//td[position() mod 6 >= 3 or position() mod 6 = 0]")
 
 
 class MUFGProvider:
@@ -74,19 +95,71 @@ class MUFGProvider:
         self.timeout = args.timeout
         self.retries = args.retry
         self.backoff = args.backoff
-        self._cache: dict[tuple[str, datetime.date], list[Quote]] = {}
+        self.workers = args.workers
+        # Quotes for each quote currency and date, keyed by base currency.
+        self._cache: dict[tuple[str, datetime.date], dict[str, Quote]] = {}
+        self._cache_lock = threading.Lock()
+        self.cache_dir = Path(args.cache_dir) if args.cache_dir else None
 
-    def _request(self, url: str) -> Any:  # noqa: ANN401
-        self.logger.debug("GET %s", url)
-        return urllib3.request(
-            "GET",
-            url,
+        # A single connection pool is shared by all requests so that
+        # connections to the MUFG site are kept alive and reused.
+        self._http = urllib3.PoolManager(
             retries=urllib3.Retry(
                 total=self.retries,
                 backoff_factor=self.backoff,
             ),
             timeout=self.timeout,
+            maxsize=self.workers,
+        )
+
+    def _request(self, url: str) -> Any:  # noqa: ANN401
+        self.logger.debug("GET %s", url)
+        return self._http.request("GET", url)
+
+    def _cache_path(self, quote_date: datetime.date) -> Path | None:
+        """Return the on-disk cache path for a date's page if it can be cached."""
+        # Pages for past dates don't change so they can be cached indefinitely.
+        # Timezone aware is not necessary here.
+        if self.cache_dir is None or quote_date >= datetime.date.today():  # noqa: DTZ011
+            return None
+        return self.cache_dir.joinpath(f"{quote_date.isoformat()}.html")
+
+    def _get_page(
+        self,
+        url: str,
+        quote_date: datetime.date,
+    ) -> tuple[bytes, Path | None]:
+        """
+        Get the page at url for the given date.
+
+        Returns the page data and the path it should be cached at, or None if
+        it was read from the cache or can't be cached.
+        """
+        cache_path = self._cache_path(quote_date)
+        if cache_path is not None and cache_path.is_file():
+            self.logger.debug("reading %s", cache_path)
+            return cache_path.read_bytes(), None
+        return self._request(url).data, cache_path
+
+    def _write_cache(self, cache_path: Path, data: bytes) -> None:
+        """Write a page to the on-disk cache."""
+        self.logger.debug("writing %s", cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # The page is written to a temporary file and then moved into place so
+        # that an interrupted write never leaves a truncated page in the cache.
+        fd, tmp_name = tempfile.mkstemp(
+            dir=cache_path.parent,
+            prefix=f".{cache_path.name}.",
         )
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            tmp_path.replace(cache_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
     def get_quote(
         self,
@@ -95,20 +168,38 @@ class MUFGProvider:
         quote_date: datetime.date,
     ) -> Quote | None:
         """Get the quote for the given currency pair and date."""
-        if (quote_currency_code, quote_date) not in self._cache:
-            self._cache[(quote_currency_code, quote_date)] = self._get_quotes_by_date(
-                quote_currency_code,
-                quote_date,
-            )
+        key = (quote_currency_code, quote_date)
+        with self._cache_lock:
+            quotes = self._cache.get(key)
+        if quotes is None:
+            quotes = {}
+            for q in self._get_quotes_by_date(quote_currency_code, quote_date):
+                quotes.setdefault(q.base_currency_code, q)
+            with self._cache_lock:
+                self._cache[key] = quotes
 
-        for q in self._cache[(quote_currency_code, quote_date)]:
-            if q.base_currency_code == base_currency_code:
-                return q
+        return quotes.get(base_currency_code)
+
+    def get_quotes(
+        self,
+        base_currency_code: str,
+        quote_currency_code: str,
+        quote_dates: list[datetime.date],
+    ) -> list[Quote]:
+        """
+        Get the quotes for the given currency pair and dates.
 
-        return None
+        Pages for each date are fetched concurrently. Quotes are returned in
+        the order of the given dates and dates without a quote are skipped.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            quotes = executor.map(
+                lambda d: self.get_quote(base_currency_code, quote_currency_code, d),
+                quote_dates,
+            )
+            return [q for q in quotes if q]
 
-    # TODO(#100): Refactor to reduce complexity
-    def _get_quotes_by_date(  # noqa: C901, PLR0912
+    def _get_quotes_by_date(
         self,
         quote_currency: str,
         quote_date: datetime.date,
@@ -119,82 +210,73 @@ class MUFGProvider:
             msg = f'currency "{quote_currency}" not supported'
             raise ValueError(msg)
 
-        url = f"https://murc-kawasesouba.jp/fx/past_3month_result.php?y={quote_date.strftime('%Y')}&m={quote_date.strftime('%m')}&d={quote_date.strftime('%d')}"
+        url = f"https://murc-kawasesouba.jp/fx/past_3month_result.php?y={quote_date.year}&m={quote_date.month:02d}&d={quote_date.day:02d}"
 
-        resp = self._request(url)
+        data, cache_path = self._get_page(url, quote_date)
 
         quotes: list[Quote] = []
-        body = resp.data
+
+        # NOTE: Some pages say they are EUC-JP but they are actually
+        #       SHIFT-JIS so we can't always rely on the parser to detect
+        #       the character set. Only ASCII text (currency codes and
+        #       rates) is read from the page so undecodable bytes are
+        #       replaced.
+        body = data.decode("shift-jis", errors="replace")
+        body = _XML_DECLARATION_RE.sub("", body, count=1)
+
         try:
-            # NOTE: Some pages say they are EUC-JP but they are actually
-            #       SHIFT-JIS so we can't always rely on BeautifulSoup to
-            #       detect the character set.
-            body = body.decode("shift-jis")
-        except UnicodeDecodeError as e:
-            # The decoding error is logged at debug level since it's "expected".
+            tables = _TABLE_XPATH(html.fromstring(body))
+        except (etree.ParserError, ValueError) as e:
             self.logger.debug("%s %s", quote_date, e)
+            tables = []
 
-        soup = BeautifulSoup(body, "html.parser")
-        table = soup.select_one("table.data-table5")
-
-        if not table:
+        if not tables:
             # This most likely means that there are no quotes for this day.
             return quotes
 
+        # Only pages with quotes are cached so that pages that were fetched
+        # before quotes were published are retried.
+        if cache_path is not None:
+            self._write_cache(cache_path, data)
+
         # NOTE: The HTML on this page is invalid. It contains </tr> but no
         #       opening <tr> tag for table rows after the first row. Thus we
         #       don't select for <tr> tags but go directly to the <td> tag.
 
-        kwargs = {}
-        for i, cell in enumerate(table.select("td")):
-            match i % 6:
-                case 0:
-                    # Base currency name is ignored.
-                    kwargs = {
-                        "provider_code": self.code,
-                        "date": Date(
-                            year=quote_date.year,
-                            month=quote_date.month,
-                            day=quote_date.day,
-                        ),
-                        "quote_currency_code": "JPY",
-                    }
-                case 1:
-                    # Japanese name is ignored
-                    pass
-                case 2:
-                    try:
-                        kwargs["base_currency_code"] = cell.get_text(strip=True)
-                    except KeyError as e:
-                        self.logger.debug("tts: %s: %s", type(e).__name__, e)
-                case 3:
-                    try:
-                        kwargs["ask"] = str_to_money(
-                            jpy_code,
-                            cell.get_text(strip=True),
-                        )
-                    except ValueError as e:
-                        self.logger.debug("tts: %s: %s", type(e).__name__, e)
-                case 4:
-                    try:
-                        kwargs["bid"] = str_to_money(
-                            jpy_code,
-                            cell.get_text(strip=True),
-                        )
-                    except ValueError as e:
-                        self.logger.debug("ttb: %s: %s", type(e).__name__, e)
-                case 5:
-                    try:
-                        kwargs["mid"] = str_to_money(
-                            jpy_code,
-                            cell.get_text(strip=True),
-                        )
-                    except ValueError as e:
-                        self.logger.debug("ttm: %s: %s", type(e).__name__, e)
-
-                    if "base_currency_code" in kwargs and (
-                        "ask" in kwargs or "bid" in kwargs or "mid" in kwargs
-                    ):
-                        quotes.append(Quote(**kwargs))
+        # The fields common to every quote on the page are built once. The Date
+        # message is copied into each Quote on construction so it can be shared.
+        base_kwargs = {
+            "provider_code": self.code,
+            "date": Date(
+                year=quote_date.year,
+                month=quote_date.month,
+                day=quote_date.day,
+            ),
+            "quote_currency_code": jpy_code,
+        }
+
+        # Each row has six cells: the quote currency, the base currency's
+        # Japanese name, the base currency code, and the TTS (ask), TTB (bid),
+        # and TTM (mid) rates. Only the last four are selected, so rows are
+        # parsed four cells at a time.
+        cells = _CELLS_XPATH(tables[0])
+        for row in range(0, len(cells) - 3, 4):
+            base_cell, tts, ttb, ttm = cells[row : row + 4]
+            kwargs = dict(
+                base_kwargs,
+                base_currency_code=base_cell.text_content().strip(),
+            )
+            for field, rate, cell in (
+                ("ask", "tts", tts),
+                ("bid", "ttb", ttb),
+                ("mid", "ttm", ttm),
+            ):
+                try:
+                    kwargs[field] = str_to_money(jpy_code, cell.text_content().strip())
+                except ValueError as e:
+                    self.logger.debug("%s: %s: %s", rate, type(e).__name__, e)
+
+            if "ask" in kwargs or "bid" in kwargs or "mid" in kwargs:
+                quotes.append(Quote(**kwargs))
 
         return quotes
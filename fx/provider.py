@@ -14,18 +14,36 @@
 
 """Currency conversion provider functions."""
 
-import csv
-import json
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+import orjson
 from google.protobuf.json_format import MessageToDict
 
+from fx.utils import ensure_dir, write_if_changed
 from fx.v1.provider_pb2 import ProviderList  # type: ignore[attr-defined]
 
 if TYPE_CHECKING:
     import logging
 
+    from fx.v1.provider_pb2 import Provider  # type: ignore[attr-defined]
+
+# Provider CSV files have a fixed header and rows are terminated with "\r\n"
+# as written by csv.writer.
+_CSV_HEADER = "name,code\r\n"
+
+
+def _csv_field(s: str) -> str:
+    """Quote a CSV field if needed, as csv.writer does by default."""
+    if "," in s or '"' in s or "\r" in s or "\n" in s:
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
+
+def _csv_row(p: Provider) -> str:
+    """Return the CSV row for a provider."""
+    return f"{_csv_field(p.name)},{_csv_field(p.code)}\r\n"
+
 
 def write_providers_site(
     base_dir: str | Path,
@@ -47,7 +65,7 @@ def write_providers_site(
         )
 
     base_path = Path(base_dir)
-    base_path.mkdir(parents=True, exist_ok=True)
+    ensure_dir(base_path)
 
     json_path = base_path.joinpath("provider.json")
     logger.debug(
@@ -56,9 +74,14 @@ def write_providers_site(
         json_path,
     )
 
+    # Convert each provider to a dict once and reuse it for both the list and
+    # the individual provider JSON files. This matches MessageToDict(plist),
+    # which omits the empty repeated field.
+    provider_dicts = [MessageToDict(p) for p in plist.providers]
+    plist_dict = {"providers": provider_dicts} if provider_dicts else {}
+
     # Write providers list JSON.
-    with json_path.open("w") as f:
-        json.dump(MessageToDict(plist), f, separators=(",", ":"))
+    write_if_changed(json_path, orjson.dumps(plist_dict))
 
     # Write providers list CSV.
     csv_path = base_path.joinpath("provider.csv")
@@ -67,52 +90,32 @@ def write_providers_site(
         len(plist.providers),
         csv_path,
     )
-    csv_fields = ["name", "code"]
-
-    with csv_path.open("w") as f:
-        if len(plist.providers) > 0:
-            w = csv.DictWriter(f, fieldnames=csv_fields)
-            w.writeheader()
-            for p in plist.providers:
-                w.writerow(
-                    {
-                        "name": p.name,
-                        "code": p.code,
-                    },
-                )
+    csv_data = ""
+    if len(plist.providers) > 0:
+        csv_data = "".join([_CSV_HEADER, *map(_csv_row, plist.providers)])
+    write_if_changed(csv_path, csv_data.encode())
 
     # Write providers list protobuf
     proto_path = base_path.joinpath("provider.binpb")
-    with proto_path.open("wb") as f:
-        logger.debug("writing %s...", f.name)
-        f.write(plist.SerializeToString())
+    logger.debug("writing %s...", proto_path)
+    write_if_changed(proto_path, plist.SerializeToString())
 
     # Write individual providers
     provider_path = base_path.joinpath("provider")
-    provider_path.mkdir(parents=True, exist_ok=True)
+    ensure_dir(provider_path)
 
-    for p in plist.providers:
+    for p, p_dict in zip(plist.providers, provider_dicts, strict=True):
         # Write provider JSON
         p_json_path = provider_path.joinpath(f"{p.code}.json")
-        with p_json_path.open("w") as f:
-            logger.debug("writing %s...", f.name)
-            json.dump(MessageToDict(p), f, separators=(",", ":"))
+        logger.debug("writing %s...", p_json_path)
+        write_if_changed(p_json_path, orjson.dumps(p_dict))
 
         # Write provider CSV
         p_csv_path = provider_path.joinpath(f"{p.code}.csv")
-        with p_csv_path.open("w") as f:
-            logger.debug("writing %s...", f.name)
-            w = csv.DictWriter(f, fieldnames=csv_fields)
-            w.writeheader()
-            w.writerow(
-                {
-                    "name": p.name,
-                    "code": p.code,
-                },
-            )
+        logger.debug("writing %s...", p_csv_path)
+        write_if_changed(p_csv_path, (_CSV_HEADER + _csv_row(p)).encode())
 
         # Write provider protobuf
         p_proto_path = provider_path.joinpath(f"{p.code}.binpb")
-        with p_proto_path.open("wb") as f:
-            logger.debug("writing %s...", f.name)
-            f.write(p.SerializeToString())
+        logger.debug("writing %s...", p_proto_path)
+        write_if_changed(p_proto_path, p.SerializeToString())
@@ -19,16 +19,22 @@ This module defines functions for downloading, reading, writing, and managing
 currency exchange quotes.
 """
 
-import csv
-import json
 from collections import defaultdict
+from itertools import pairwise
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, NamedTuple
 
+import orjson
 from dateutil.relativedelta import relativedelta
 from google.protobuf.json_format import MessageToDict
 
-from fx.utils import date_iterator, date_msg_to_str, money_to_str
+from fx.utils import (
+    date_iterator,
+    date_msg_to_str,
+    ensure_dir,
+    money_to_str,
+    write_if_changed,
+)
 from fx.v1.quote_pb2 import Quote, QuoteList  # type: ignore[attr-defined]
 
 if TYPE_CHECKING:
@@ -36,33 +42,50 @@ if TYPE_CHECKING:
     import logging
 
 
-def quote_in(q: Quote, quotes: list[Quote]) -> bool:
+# Quote CSV files have a fixed header and rows are terminated with "\r\n" as
+# written by csv.writer.
+_CSV_HEADER = "date,providerCode,baseCurrencyCode,quoteCurrencyCode,ask,bid,mid\r\n"
+
+
+def _csv_row(q: Quote) -> str:
     """
-    Check if a quote is in a list of quotes.
+    Return the CSV row for a quote.
 
-    It returns True if the given quote object has a matching quote in
-    the given list of quotes.
+    None of the fields can contain a delimiter, quote character, or line break
+    so they are not quoted. Missing values are written as empty fields.
     """
-    return any(quote_equal(q, q2) for q2 in quotes)
+    return (
+        f"{date_msg_to_str(q.date) or ''},{q.provider_code},"
+        f"{q.base_currency_code},{q.quote_currency_code},"
+        f"{money_to_str(q.ask) or ''},{money_to_str(q.bid) or ''},"
+        f"{money_to_str(q.mid) or ''}\r\n"
+    )
 
 
-def quote_equal(q1: Quote, q2: Quote) -> bool:
+def quote_key(q: Quote) -> tuple[str, int, int, int, str, str]:
     """
-    Check if two quotes are equal.
+    Return the identity of a quote.
 
-    quote_equal returns if two quotes are quotes from the same provider, for
-    the same day, for the same currency pair.
+    Two quotes have the same key if they are quotes from the same provider,
+    for the same day, for the same currency pair.
     """
-    return bool(
-        q1.provider_code == q2.provider_code
-        and q1.date.year == q2.date.year
-        and q1.date.month == q2.date.month
-        and q1.date.day == q2.date.day
-        and q1.base_currency_code == q2.base_currency_code
-        and q1.quote_currency_code == q2.quote_currency_code,
+    d = q.date
+    return (
+        q.provider_code,
+        d.year,
+        d.month,
+        d.day,
+        q.base_currency_code,
+        q.quote_currency_code,
     )
 
 
+def _date_key(q: Quote) -> tuple[int, int, int]:
+    """Return a key that orders quotes by date."""
+    d = q.date
+    return (d.year, d.month, d.day)
+
+
 def download_quotes(  # noqa: PLR0913
     provider: Any,  # noqa: ANN401
     base_currency_code: str,
@@ -72,7 +95,6 @@ def download_quotes(  # noqa: PLR0913
     logger: logging.Logger,
 ) -> list[Quote]:
     """Get quotes for each day in the given date range."""
-    quotes = []
     logger.info(
         "downloading %s quotes for currency pair %s/%s for %s to %s...",
         provider.code,
@@ -81,7 +103,17 @@ def download_quotes(  # noqa: PLR0913
         start_date.isoformat(),
         end_date.isoformat(),
     )
-    for dt in date_iterator(start_date, end_date, relativedelta(days=1)):
+    dates = date_iterator(start_date, end_date, relativedelta(days=1))
+
+    # Providers may implement get_quotes to fetch a range of dates at once.
+    get_quotes = getattr(provider, "get_quotes", None)
+    quotes: list[Quote]
+    if get_quotes is not None:
+        quotes = get_quotes(base_currency_code, quote_currency_code, list(dates))
+        return quotes
+
+    quotes = []
+    for dt in dates:
         quote = provider.get_quote(base_currency_code, quote_currency_code, dt)
         if quote:
             quotes.append(quote)
@@ -122,25 +154,46 @@ def write_quotes_data(
 
     data_path = Path(proto_path)
 
-    data_path.parent.mkdir(parents=True, exist_ok=True)
+    ensure_dir(data_path.parent)
 
     try:
         existing_quotelist = read_quotelist_data(proto_path, logger)
     except FileNotFoundError:
         existing_quotelist = QuoteList()
 
-    quotes.extend([q for q in existing_quotelist.quotes if not quote_in(q, quotes)])
-    quotes = sorted(quotes, key=lambda q: (q.date.year, q.date.month, q.date.day))
-
-    qlist = QuoteList()
-    qlist.quotes.extend(quotes)
-    with data_path.open("wb") as f:
+    # Quotes for dates after all of the existing quotes are appended to the
+    # file. Serialized QuoteList messages can be concatenated and parse as a
+    # single QuoteList.
+    existing_quotes = existing_quotelist.quotes
+    if existing_quotes and all(
+        a < b for a, b in pairwise(_date_key(q) for q in [existing_quotes[-1], *quotes])
+    ):
         logger.debug(
-            "writing %s quotes to %s...",
-            len(qlist.quotes),
-            f.name,
+            "appending %s quotes to %s...",
+            len(quotes),
+            data_path,
         )
-        f.write(qlist.SerializeToString())
+        with data_path.open("ab") as f:
+            f.write(QuoteList(quotes=quotes).SerializeToString())
+        return
+
+    # Existing quotes are kept unless they are replaced by a new quote for the
+    # same key.
+    new_keys = {quote_key(q) for q in quotes}
+    for i in reversed(range(len(existing_quotes))):
+        if quote_key(existing_quotes[i]) in new_keys:
+            del existing_quotes[i]
+    existing_quotes.extend(quotes)
+    existing_quotes.sort(key=_date_key)
+
+    logger.debug(
+        "writing %s quotes to %s...",
+        len(existing_quotes),
+        data_path,
+    )
+    # Re-downloading the same quotes gives the same data so the file is only
+    # written if it has changed.
+    write_if_changed(data_path, existing_quotelist.SerializeToString())
 
 
 def write_quotes_csv(
@@ -149,38 +202,49 @@ def write_quotes_csv(
     logger: logging.Logger,
 ) -> None:
     """Write a list of Quote objects to a CSV file."""
+    _write_csv_rows(path, [_csv_row(q) for q in quotes], logger)
+
+
+def _write_csv_rows(
+    path: str | Path,
+    csv_rows: list[str],
+    logger: logging.Logger,
+) -> None:
+    """Write formatted quote CSV rows to a CSV file."""
     csv_path = Path(path)
-    with csv_path.open("w") as f:
-        logger.debug(
-            "writing %s quotes to %s...",
-            len(quotes),
-            f.name,
-        )
-        w = csv.DictWriter(
-            f,
-            fieldnames=[
-                "date",
-                "providerCode",
-                "baseCurrencyCode",
-                "quoteCurrencyCode",
-                "ask",
-                "bid",
-                "mid",
-            ],
-        )
-        w.writeheader()
-        for q in quotes:
-            w.writerow(
-                {
-                    "date": date_msg_to_str(q.date),
-                    "providerCode": q.provider_code,
-                    "baseCurrencyCode": q.base_currency_code,
-                    "quoteCurrencyCode": q.quote_currency_code,
-                    "ask": money_to_str(q.ask),
-                    "bid": money_to_str(q.bid),
-                    "mid": money_to_str(q.mid),
-                },
-            )
+    logger.debug(
+        "writing %s quotes to %s...",
+        len(csv_rows),
+        csv_path,
+    )
+    write_if_changed(csv_path, "".join([_CSV_HEADER, *csv_rows]).encode())
+
+
+class _QuoteOutput(NamedTuple):
+    """
+    A quote converted for the site's file formats.
+
+    Quotes are written to the year, month, and day files so they are converted
+    once and reused for each.
+    """
+
+    quote_dict: dict[str, Any]
+    csv_row: str
+
+
+def _quote_output(q: Quote) -> _QuoteOutput:
+    """Convert a quote for the site's file formats."""
+    return _QuoteOutput(MessageToDict(q), _csv_row(q))
+
+
+def _quote_list_dict(outputs: list[_QuoteOutput]) -> dict[str, Any]:
+    """
+    Return the dict for a QuoteList given the converted quotes.
+
+    This matches MessageToDict for the QuoteList, which omits the empty
+    repeated field.
+    """
+    return {"quotes": [o.quote_dict for o in outputs]} if outputs else {}
 
 
 def write_year_quotes_site(
@@ -196,7 +260,7 @@ def write_year_quotes_site(
     year's worth of quote files.
     """
     base_path = Path(base_dir)
-    base_path.mkdir(parents=True, exist_ok=True)
+    ensure_dir(base_path)
 
     json_path = base_path.joinpath(f"{year:04d}.json")
     logger.debug(
@@ -205,30 +269,35 @@ def write_year_quotes_site(
         json_path,
     )
 
+    # Convert each quote once and reuse it for the year, month, and day files.
+    outputs = [_quote_output(q) for q in quotelist.quotes]
+
     # Write currencies list JSON.
-    with json_path.open("w") as f:
-        json.dump(MessageToDict(quotelist), f, separators=(",", ":"))
+    write_if_changed(json_path, orjson.dumps(_quote_list_dict(outputs)))
 
     # Write quote list CSV.
     csv_path = base_path.joinpath(f"{year:04d}.csv")
-    write_quotes_csv(csv_path, quotelist.quotes, logger)
+    _write_csv_rows(csv_path, [o.csv_row for o in outputs], logger)
 
     # Write quote list protobuf
     proto_path = base_path.joinpath(f"{year:04d}.binpb")
-    with proto_path.open("wb") as f:
-        logger.debug("writing %s...", f.name)
-        f.write(quotelist.SerializeToString())
+    logger.debug("writing %s...", proto_path)
+    write_if_changed(proto_path, quotelist.SerializeToString())
 
-    month_qlists: dict[int, QuoteList] = defaultdict(QuoteList)
-    for q in quotelist.quotes:
-        month_qlists[q.date.month].quotes.append(q)
+    # Partition the quotes by month.
+    month_quotes: dict[int, list[Quote]] = defaultdict(list)
+    month_outputs: dict[int, list[_QuoteOutput]] = defaultdict(list)
+    for q, output in zip(quotelist.quotes, outputs, strict=True):
+        month_quotes[q.date.month].append(q)
+        month_outputs[q.date.month].append(output)
 
-    for month, month_qlist in month_qlists.items():
+    for month, quotes in month_quotes.items():
         write_month_quotes_site(
             base_path.joinpath(f"{year:04d}"),
             month,
-            month_qlist,
+            QuoteList(quotes=quotes),
             logger,
+            month_outputs[month],
         )
 
 
@@ -237,15 +306,17 @@ def write_month_quotes_site(
     month: int,
     quotelist: QuoteList,
     logger: logging.Logger,
+    outputs: list[_QuoteOutput] | None = None,
 ) -> None:
     """
     Write a month's worth of quote files to the site directory.
 
     write_month_quotes_site writes quote API files to the site directory for a
-    month's worth of quote files.
+    month's worth of quote files. outputs are the converted quotes if they
+    have already been converted.
     """
     base_path = Path(base_dir)
-    base_path.mkdir(parents=True, exist_ok=True)
+    ensure_dir(base_path)
 
     json_path = base_path.joinpath(f"{month:02d}.json")
     logger.debug(
@@ -254,31 +325,33 @@ def write_month_quotes_site(
         json_path,
     )
 
+    if outputs is None:
+        outputs = [_quote_output(q) for q in quotelist.quotes]
+
     # write currencies list JSON.
-    with json_path.open("w") as f:
-        json.dump(MessageToDict(quotelist), f, separators=(",", ":"))
+    write_if_changed(json_path, orjson.dumps(_quote_list_dict(outputs)))
 
     # write quote list CSV.
     csv_path = base_path.joinpath(f"{month:02d}.csv")
-    write_quotes_csv(csv_path, quotelist.quotes, logger)
+    _write_csv_rows(csv_path, [o.csv_row for o in outputs], logger)
 
     # Write quote list proto
     proto_path = base_path.joinpath(f"{month:02d}.binpb")
-    with proto_path.open("wb") as f:
-        logger.debug("writing %s...", f.name)
-        f.write(quotelist.SerializeToString())
+    logger.debug("writing %s...", proto_path)
+    write_if_changed(proto_path, quotelist.SerializeToString())
 
-    for q in quotelist.quotes:
-        write_day_quote_site(base_path.joinpath(f"{month:02d}"), q, logger)
+    for q, output in zip(quotelist.quotes, outputs, strict=True):
+        write_day_quote_site(base_path.joinpath(f"{month:02d}"), q, logger, output)
 
 
 def write_day_quote_site(
     base_dir: str | Path,
     quote: Quote,
     logger: logging.Logger,
+    output: _QuoteOutput | None = None,
 ) -> None:
     """Write a day's worth of quote files to the site directory."""
-    _write_quote_site(base_dir, f"{quote.date.day:02d}", quote, logger)
+    _write_quote_site(base_dir, f"{quote.date.day:02d}", quote, logger, output)
 
 
 def write_latest_quote_site(
@@ -295,24 +368,26 @@ def _write_quote_site(
     file_name: str,
     quote: Quote,
     logger: logging.Logger,
+    output: _QuoteOutput | None = None,
 ) -> None:
     """Write a quote file to the site directory."""
     base_path = Path(base_dir)
-    base_path.mkdir(parents=True, exist_ok=True)
+    ensure_dir(base_path)
 
     json_path = base_path.joinpath(f"{file_name}.json")
     logger.debug("writing %s...", json_path)
 
+    if output is None:
+        output = _quote_output(quote)
+
     # write currencies list JSON.
-    with json_path.open("w") as f:
-        json.dump(MessageToDict(quote), f, separators=(",", ":"))
+    write_if_changed(json_path, orjson.dumps(output.quote_dict))
 
     # write quote list CSV.
     csv_path = base_path.joinpath(f"{file_name}.csv")
-    write_quotes_csv(csv_path, [quote], logger)
+    _write_csv_rows(csv_path, [output.csv_row], logger)
 
     # Write quote list proto
     proto_path = base_path.joinpath(f"{file_name}.binpb")
-    with proto_path.open("wb") as f:
-        logger.debug("writing %s...", f.name)
-        f.write(quote.SerializeToString())
+    logger.debug("writing %s...", proto_path)
+    write_if_changed(proto_path, quote.SerializeToString())
@@ -26,7 +26,7 @@ from typing import TYPE_CHECKING
 from dateutil.relativedelta import relativedelta
 
 from fx.quote import download_quotes, write_quotes_data
-from fx.utils import date_iterator
+from fx.utils import clear_dir_cache, date_iterator
 
 if TYPE_CHECKING:
     import argparse
@@ -39,7 +39,12 @@ def update_command(args: argparse.Namespace) -> None:
     This command downloads quote data given the command line arguments
     and stores them in the specified data directory.
     """
-    args.logger.debug("running update")
+    logger = args.logger
+    logger.debug("running update")
+
+    # The data directory may have been changed since a previous run in this
+    # process.
+    clear_dir_cache()
 
     data_path = Path(args.data_dir)
 
@@ -47,39 +52,51 @@ def update_command(args: argparse.Namespace) -> None:
 
     # Update quotes
 
-    # Process the date range by year
-    for Provider in args.provider:  # noqa: N806 // Provider is a class
-        provider = Provider(args)
+    # The date range is processed by year. The range for each year is the same
+    # for every provider and currency pair so it is computed once.
+    start = args.start
+    end = args.end
+    year_ranges = [
+        (
+            year_start.year,
+            start if start.year == year_start.year else year_start,
+            end if end.year == year_start.year else date(year_start.year, 12, 31),
+        )
         for year_start in date_iterator(
-            date(args.start.year, 1, 1),
-            args.end,
+            date(start.year, 1, 1),
+            end,
             relativedelta(years=1),
-        ):
-            for base_currency_code in provider.supported_base_currencies:
-                for quote_currency_code in provider.supported_quote_currencies:
-                    start_date = year_start
-                    if args.start.year == year_start.year:
-                        start_date = args.start
-
-                    end_date = date(year_start.year, 12, 31)
-                    if args.end.year == year_start.year:
-                        end_date = args.end
-
-                    quotes = download_quotes(
-                        provider,
-                        base_currency_code,
-                        quote_currency_code,
-                        start_date,
-                        end_date,
-                        args.logger,
-                    )
-
-                    # Data will be stored in files of the form:
-                    #   data/MUFG/USD/JPY/2025.binpb
-                    quotes_proto_path = data_path.joinpath(
-                        provider.code,
-                        base_currency_code,
-                        quote_currency_code,
-                        f"{year_start.year}.binpb",
-                    )
-                    write_quotes_data(quotes_proto_path, quotes, args.logger)
+        )
+    ]
+
+    for Provider in args.provider:  # noqa: N806 // Provider is a class
+        provider = Provider(args)
+        provider_path = data_path.joinpath(provider.code)
+        # The data directory for each currency pair is the same for every year.
+        pair_paths = [
+            (
+                base_currency_code,
+                quote_currency_code,
+                provider_path.joinpath(base_currency_code, quote_currency_code),
+            )
+            for base_currency_code in provider.supported_base_currencies
+            for quote_currency_code in provider.supported_quote_currencies
+        ]
+        for year, start_date, end_date in year_ranges:
+            for base_currency_code, quote_currency_code, pair_path in pair_paths:
+                quotes = download_quotes(
+                    provider,
+                    base_currency_code,
+                    quote_currency_code,
+                    start_date,
+                    end_date,
+                    logger,
+                )
+                if not quotes:
+                    # Nothing to write, e.g. a range with no business days.
+                    continue
+
+                # Data will be stored in files of the form:
+                #   data/MUFG/USD/JPY/2025.binpb
+                quotes_proto_path = pair_path.joinpath(f"{year}.binpb")
+                write_quotes_data(quotes_proto_path, quotes, logger)
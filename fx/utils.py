@@ -14,7 +14,11 @@
 
 """Utilities used throughout fx."""
 
+import functools
+import itertools
+import os
 from datetime import date
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 from dateutil.relativedelta import relativedelta
@@ -27,6 +31,59 @@ if TYPE_CHECKING:
     from google.protobuf.message import Message
 
 
+# Directories already created by ensure_dir. Commands clear this when they
+# start with clear_dir_cache as directories may have been removed since.
+_created_dirs: set[str] = set()
+
+
+def clear_dir_cache() -> None:
+    """Forget the directories created by ensure_dir."""
+    _created_dirs.clear()
+
+
+def ensure_dir(path: str | Path) -> None:
+    """
+    Create the directory at path, and any parents, if it does not exist.
+
+    Directories are remembered once created so that repeated calls for the
+    same directory do not make any system calls.
+    """
+    key = str(path)
+    if key in _created_dirs:
+        return
+    Path(path).mkdir(parents=True, exist_ok=True)
+    _created_dirs.add(key)
+
+
+def write_if_changed(path: str | Path, data: bytes) -> bool:
+    """
+    Write data to the file at path unless it already has the same contents.
+
+    Unchanged files are left untouched so that their modification times are
+    preserved across incremental builds. Returns True if the file was written.
+    """
+    # The file is read and written with os-level calls.
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        pass
+    else:
+        try:
+            if os.fstat(fd).st_size == len(data) and os.read(fd, len(data)) == data:
+                return False
+        finally:
+            os.close(fd)
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+    return True
+
+
 def date_iterator(
     from_date: date | None = None,
     to_date: date | None = None,
@@ -44,6 +101,20 @@ def date_iterator(
         delta = relativedelta(days=1)
     # Timezone aware is not necessary here.
     from_date = from_date or date.today()  # noqa: DTZ011
+
+    # Steps of a whole number of days are done with date ordinals.
+    step = delta.days
+    if step > 0 and type(from_date) is date and delta == relativedelta(days=step):
+        start = from_date.toordinal()
+        ordinals = (
+            itertools.count(start, step)
+            if to_date is None
+            else range(start, to_date.toordinal() + 1, step)
+        )
+        for o in ordinals:
+            yield date.fromordinal(o)
+        return
+
     while to_date is None or from_date <= to_date:
         yield from_date
         from_date = from_date + delta
@@ -51,7 +122,21 @@ def date_iterator(
 
 def date_msg_to_str(d: Message) -> str | None:
     """Convert a Date protobuf message to a string."""
-    return date_dict_to_str(MessageToDict(d))
+    # Invalid dates fall back to date_dict_to_str so the error is the same.
+    year = d.year
+    month = d.month
+    day = d.day
+
+    if not year or (day and not month):
+        return date_dict_to_str(MessageToDict(d))
+
+    if day:
+        return f"{year:04d}/{month:02d}/{day:02d}"
+
+    if month:
+        return f"{year:04d}/{month:02d}"
+
+    return f"{year:04d}"
 
 
 def date_dict_to_str(d: dict[str, Any]) -> str | None:
@@ -84,35 +169,41 @@ def str_to_money(code: str, s: str) -> Money:
     The string `s` should be a decimal representation of the amount, e.g. "123.45". If
     the string is invalid a ValueError is raised.
     """
-    parts = s.split(".")
-    max_parts = 2
-    if len(parts) > max_parts:
+    units, nanos = _parse_decimal(s)
+    return Money(
+        currency_code=code,
+        units=units,
+        nanos=nanos,
+    )
+
+
+# Parsed amounts are cached as (units, nanos) tuples since Money messages are
+# mutable. Invalid strings raise and are not cached.
+@functools.lru_cache(maxsize=4096)
+def _parse_decimal(s: str) -> tuple[int, int]:
+    """Parse a decimal string into Money units and nanos."""
+    dot = s.find(".")
+    if dot < 0:
+        return int(s), 0
+
+    if s.find(".", dot + 1) >= 0:
         msg = f"invalid number: {s}"
         raise ValueError(msg)
 
-    units = int(parts[0])
-    nanos = 0
+    units = int(s[:dot])
 
-    if len(parts) > 1:
-        nanos_str = parts[1] + "0" * (9 - len(parts[1]))
-        max_nanos_decimals = 9
-        if len(nanos_str) > max_nanos_decimals:
-            nanos_str = nanos_str[:max_nanos_decimals]
-
-        nanos = int(nanos_str)
-        if nanos < 0:
-            msg = f"invalid number: {s}"
-            raise ValueError(msg)
+    # The fraction is padded with zeros and digits beyond nanosecond precision
+    # are truncated.
+    nanos = int((s[dot + 1 : dot + 10] + "000000000")[:9])
+    if nanos < 0:
+        msg = f"invalid number: {s}"
+        raise ValueError(msg)
 
     # If units is negative (or zero) nanos must also be negative (or zero).
     if units < 0:
-        nanos = -1 * nanos
+        nanos = -nanos
 
-    return Money(
-        currency_code=code,
-        units=units,
-        nanos=nanos,
-    )
+    return units, nanos
 
 
 def money_dict_to_str(d: dict[str, Any]) -> str | None:
@@ -143,6 +234,25 @@ def money_to_str(m: Money) -> str | None:
 
     The string is a decimal representation of the amount, e.g. "123.45".
     """
-    if not m:
+    # As in money_dict_to_str(MessageToDict(m)), a message with no fields set
+    # is treated as missing.
+    if not (m.units or m.nanos or m.currency_code):
         return None
-    return money_dict_to_str(MessageToDict(m))
+    return _format_decimal(m.units, m.nanos)
+
+
+@functools.lru_cache(maxsize=8192)
+def _format_decimal(units: int, nanos: int) -> str:
+    """
+    Format units and nanos as a decimal string.
+
+    Rates repeat often across a year of quotes so the formatted strings are
+    cached. The currency code is not part of the string and so is not part of
+    the key.
+    """
+    if not nanos:
+        return f"{units}."
+
+    # nanos might have been negative but is always positive in the string
+    # representation. The decimal point stops rstrip from reaching units.
+    return f"{units}.{abs(nanos):09d}".rstrip("0")
@@ -13,3 +13,11 @@
 # limitations under the License.
 
 """unit tests for the fx package."""
+
+from pathlib import Path
+
+# The tests create many small files so temporary directories are created on a
+# RAM-backed file system when one is available. Directories are still created
+# securely by tempfile.
+_SHM_DIR = Path("/dev/shm")  # noqa: S108
+TEMP_DIR = str(_SHM_DIR) if _SHM_DIR.is_dir() else None
@@ -14,6 +14,7 @@
 
 """A mock currency quote provider for tests."""
 
+import functools
 from typing import TYPE_CHECKING, Any, ClassVar
 
 if TYPE_CHECKING:
@@ -25,6 +26,21 @@ from google.type.money_pb2 import Money
 from fx.v1.quote_pb2 import Quote  # type: ignore[attr-defined]
 
 
+@functools.cache
+def _amounts(quote_currency_code: str) -> dict[str, Money]:
+    """
+    Return the mock ask, bid, and mid amounts for a quote currency.
+
+    The amounts are the same for every quote so they are built once and
+    copied into each Quote on construction.
+    """
+    return {
+        "ask": Money(currency_code=quote_currency_code, units=112, nanos=250000000),
+        "bid": Money(currency_code=quote_currency_code, units=110, nanos=250000000),
+        "mid": Money(currency_code=quote_currency_code, units=111, nanos=250000000),
+    }
+
+
 class MockProvider:
     """A mock provider for testing."""
 
@@ -48,37 +64,14 @@ class MockProvider:
             return None
         if quote_currency_code not in self.supported_quote_currencies:
             return None
-        quote = Quote()
-        quote.provider_code = self.code
-        quote.base_currency_code = base_currency_code
-        quote.quote_currency_code = quote_currency_code
-        quote.date.CopyFrom(
-            Date(
+        return Quote(
+            provider_code=self.code,
+            base_currency_code=base_currency_code,
+            quote_currency_code=quote_currency_code,
+            date=Date(
                 year=quote_date.year,
                 month=quote_date.month,
                 day=quote_date.day,
             ),
+            **_amounts(quote_currency_code),
         )
-        quote.bid.CopyFrom(
-            Money(
-                currency_code=quote_currency_code,
-                units=110,
-                nanos=250000000,
-            ),
-        )
-        quote.mid.CopyFrom(
-            Money(
-                currency_code=quote_currency_code,
-                units=111,
-                nanos=250000000,
-            ),
-        )
-        quote.ask.CopyFrom(
-            Money(
-                currency_code=quote_currency_code,
-                units=112,
-                nanos=250000000,
-            ),
-        )
-
-        return quote
@@ -16,170 +16,152 @@
 
 import argparse
 import logging
+import shutil
 import tempfile
 import unittest
 from pathlib import Path
 
+from google.type.date_pb2 import Date
+from google.type.money_pb2 import Money
+
 from fx.build import build_command
-from fx.v1.quote_pb2 import QuoteList  # type: ignore[attr-defined]
+from fx.v1.quote_pb2 import Quote, QuoteList  # type: ignore[attr-defined]
+from tests import TEMP_DIR
 from tests.mock_provider import MockProvider
 
 
+def _test_quotelist() -> QuoteList:
+    """Return the test quotes."""
+    return QuoteList(
+        quotes=[
+            Quote(
+                provider_code="MOCK",
+                base_currency_code="USD",
+                quote_currency_code="JPY",
+                date=Date(year=2023, month=1, day=1),
+                ask=Money(units=131, nanos=500000000),
+                bid=Money(units=129, nanos=500000000),
+                mid=Money(units=130, nanos=0),
+            ),
+            Quote(
+                provider_code="MOCK",
+                base_currency_code="USD",
+                quote_currency_code="JPY",
+                date=Date(year=2023, month=1, day=2),
+                ask=Money(units=141, nanos=500000000),
+                bid=Money(units=139, nanos=500000000),
+                mid=Money(units=140, nanos=0),
+            ),
+        ],
+    )
+
+
+# The test data is the same for every test so it is serialized once.
+_TEST_DATA = _test_quotelist().SerializeToString()
+
+
 def _write_test_data(data_dir_path: Path) -> None:
     """Write test data."""
-    quotes = QuoteList()
-    quote = quotes.quotes.add()
-    quote.provider_code = "MOCK"
-    quote.base_currency_code = "USD"
-    quote.quote_currency_code = "JPY"
-    quote.date.year = 2023
-    quote.date.month = 1
-    quote.date.day = 1
-    quote.ask.units = 131
-    quote.ask.nanos = 500000000
-    quote.bid.units = 129
-    quote.bid.nanos = 500000000
-    quote.mid.units = 130
-    quote.mid.nanos = 0
-
-    quote = quotes.quotes.add()
-    quote.provider_code = "MOCK"
-    quote.base_currency_code = "USD"
-    quote.quote_currency_code = "JPY"
-    quote.date.year = 2023
-    quote.date.month = 1
-    quote.date.day = 2
-    quote.ask.units = 141
-    quote.ask.nanos = 500000000
-    quote.bid.units = 139
-    quote.bid.nanos = 500000000
-    quote.mid.units = 140
-    quote.mid.nanos = 0
-
     quote_file_path = data_dir_path.joinpath("MOCK", "USD", "JPY", "2023.binpb")
     quote_file_path.parent.mkdir(parents=True, exist_ok=True)
-    with quote_file_path.open("wb") as f:
-        f.write(quotes.SerializeToString())
+    quote_file_path.write_bytes(_TEST_DATA)
+
+
+# Logger passed to build_command by the tests.
+_LOGGER = logging.getLogger("TestBuildCommand")
+_LOGGER.addHandler(logging.NullHandler())
 
 
 class TestBuildCommand(unittest.TestCase):
     """Tests for the build command."""
 
+    temp_data_dir: tempfile.TemporaryDirectory[str]
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Set up the test data."""
+        # build_command only reads the data directory so it is written once
+        # and shared by the tests.
+        cls.temp_data_dir = tempfile.TemporaryDirectory(dir=TEMP_DIR)
+        _write_test_data(Path(cls.temp_data_dir.name))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Tear down the test data."""
+        cls.temp_data_dir.cleanup()
+
     def setUp(self) -> None:
         """Set up the test case."""
-        self.temp_data_dir = tempfile.TemporaryDirectory()
-        self.temp_site_dir = tempfile.TemporaryDirectory()
-        _write_test_data(Path(self.temp_data_dir.name))
+        self.temp_site_dir = tempfile.TemporaryDirectory(dir=TEMP_DIR)
+        self.args = argparse.Namespace(
+            logger=_LOGGER,
+            data_dir=self.temp_data_dir.name,
+            site_dir=self.temp_site_dir.name,
+            provider=[MockProvider],
+        )
 
     def tearDown(self) -> None:
         """Tear down the test case."""
-        self.temp_data_dir.cleanup()
         self.temp_site_dir.cleanup()
 
     def test_build_command(self) -> None:
         """Test the build command."""
-        build_command(
-            args=argparse.Namespace(
-                logger=logging.getLogger("TestBuildCommand"),
-                data_dir=self.temp_data_dir.name,
-                site_dir=self.temp_site_dir.name,
-                provider=[MockProvider],
-            ),
+        build_command(args=self.args)
+
+        # The site tree is walked once and compared with the expected files so
+        # that unexpected files are also caught.
+        site_path = Path(self.temp_site_dir.name)
+        site_files = {
+            p.relative_to(site_path).as_posix()
+            for p in site_path.rglob("*")
+            if p.is_file()
+        }
+
+        quote_dir = "v1/provider/MOCK/quote/USD/JPY"
+        expected_files = {
+            path
+            for ext in ["json", "csv", "binpb"]
+            for path in [
+                # Providers
+                f"v1/provider.{ext}",
+                # Provider
+                f"v1/provider/MOCK.{ext}",
+                # latest Quotes
+                f"{quote_dir}/latest.{ext}",
+                # Historical Quotes for 2023
+                f"{quote_dir}/2023.{ext}",
+                # Monthly Quotes for 2023-01
+                f"{quote_dir}/2023/01.{ext}",
+                # Daily Quotes for 2023-01-01 and 2023-01-02
+                f"{quote_dir}/2023/01/01.{ext}",
+                f"{quote_dir}/2023/01/02.{ext}",
+            ]
+        }
+        self.assertSetEqual(site_files, expected_files)
+
+    def test_build_command_removed_site_dir(self) -> None:
+        """Test rebuilding after the site directory has been removed."""
+        build_command(args=self.args)
+        shutil.rmtree(self.temp_site_dir.name)
+
+        build_command(args=self.args)
+
+        self.assertTrue(
+            Path(self.temp_site_dir.name)
+            .joinpath("v1", "provider", "MOCK", "quote", "USD", "JPY", "latest.json")
+            .is_file(),
         )
 
-        formats = ["json", "csv", "binpb"]
-
-        # Provider
-        for ext in formats:
-            self.assertTrue(
-                Path(self.temp_site_dir.name)
-                .joinpath(
-                    "v1",
-                    "provider",
-                    f"MOCK.{ext}",
-                )
-                .exists(),
-            )
-
-        # latest Quotes
-        for ext in formats:
-            self.assertTrue(
-                Path(self.temp_site_dir.name)
-                .joinpath(
-                    "v1",
-                    "provider",
-                    "MOCK",
-                    "quote",
-                    "USD",
-                    "JPY",
-                    f"latest.{ext}",
-                )
-                .exists(),
-            )
-
-        # Historical Quotes for 2023
-        for ext in formats:
-            self.assertTrue(
-                Path(self.temp_site_dir.name)
-                .joinpath(
-                    "v1",
-                    "provider",
-                    "MOCK",
-                    "quote",
-                    "USD",
-                    "JPY",
-                    f"2023.{ext}",
-                )
-                .exists(),
-            )
-
-        # Monthly Quotes for 2023-01
-        for ext in formats:
-            self.assertTrue(
-                Path(self.temp_site_dir.name)
-                .joinpath(
-                    "v1",
-                    "provider",
-                    "MOCK",
-                    "quote",
-                    "USD",
-                    "JPY",
-                    "2023",
-                    f"01.{ext}",
-                )
-                .exists(),
-            )
-
-        # Daily Quotes for 2023-01-01
-        for ext in formats:
-            self.assertTrue(
-                Path(self.temp_site_dir.name)
-                .joinpath(
-                    "v1",
-                    "provider",
-                    "MOCK",
-                    "quote",
-                    "USD",
-                    "JPY",
-                    "2023",
-                    "01",
-                    f"01.{ext}",
-                )
-                .exists(),
-            )
-
-            self.assertTrue(
-                Path(self.temp_site_dir.name)
-                .joinpath(
-                    "v1",
-                    "provider",
-                    "MOCK",
-                    "quote",
-                    "USD",
-                    "JPY",
-                    "2023",
-                    "01",
-                    f"02.{ext}",
-                )
-                .exists(),
-            )
+    def test_build_command_unchanged(self) -> None:
+        """Test that rebuilding leaves unchanged files untouched."""
+        build_command(args=self.args)
+
+        site_files = [
+            p for p in Path(self.temp_site_dir.name).rglob("*") if p.is_file()
+        ]
+        mtimes = {p: p.stat().st_mtime_ns for p in site_files}
+
+        build_command(args=self.args)
+
+        for p in site_files:
+            self.assertEqual(p.stat().st_mtime_ns, mtimes[p], p)
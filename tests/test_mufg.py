@@ -17,10 +17,53 @@
 import argparse
 import datetime
 import logging
+import tempfile
 import unittest
+from pathlib import Path
 from unittest import mock
 
 from fx.mufg import MUFGProvider
+from tests import TEMP_DIR
+
+# A MUFG quote page with a USD/JPY quote. It is encoded once and shared by
+# the tests.
+_MUFG_HTML = """
+<html>
+    <head><title>Test</title></head>
+    <body>
+        <table class="data-table5">
+            <tr>
+
+                <th>Quote Currency</th>
+                <th>Base Currency Name</th>
+                <th>Base Currency</th>
+                <th>Buying Rate</th>
+                <th>Selling Rate</th>
+                <th>Middle Rate</th>
+            </tr>
+            <tr>
+                <td>JPY</td>
+                <td>米国ドル</td>
+                <td>USD</td>
+                <td>109.25</td>
+                <td>111.25</td>
+                <td>110.25</td>
+            </tr>
+        </table>
+    </body>
+</html>
+""".encode("euc-jp")
+
+
+# Provider arguments shared by the tests. The provider does not modify them.
+_ARGS = argparse.Namespace(
+    logger=logging.getLogger("fx"),
+    timeout=10,
+    retry=0,
+    backoff=0,
+    workers=4,
+    cache_dir=None,
+)
 
 
 class _MockResponse:
@@ -31,49 +74,27 @@ class _MockResponse:
 class TestMUFGProvider(unittest.TestCase):
     """Tests for MUFGProvider."""
 
+    def setUp(self) -> None:
+        """Set up the test case."""
+        # The provider caches parsed pages so each test gets a new one.
+        self.provider = MUFGProvider(_ARGS)
+
     def test_get_quote(self) -> None:
         """Test the get_quote provider method."""
-        with mock.patch.object(MUFGProvider, "_request") as mocked_request:
-            mocked_request.return_value = _MockResponse(
-                """
-                <html>
-                    <head><title>Test</title></head>
-                    <body>
-                        <table class="data-table5">
-                            <tr>
-
-                                <th>Quote Currency</th>
-                                <th>Base Currency Name</th>
-                                <th>Base Currency</th>
-                                <th>Buying Rate</th>
-                                <th>Selling Rate</th>
-                                <th>Middle Rate</th>
-                            </tr>
-                            <tr>
-                                <td>JPY</td>
-                                <td>米国ドル</td>
-                                <td>USD</td>
-                                <td>109.25</td>
-                                <td>111.25</td>
-                                <td>110.25</td>
-                            </tr>
-                        </table>
-                    </body>
-                </html>
-                """.encode("euc-jp"),
-            )
-
-            provider = MUFGProvider(
-                argparse.Namespace(
-                    logger=logging.getLogger("fx"),
-                    timeout=10,
-                    retry=0,
-                    backoff=0,
-                ),
+        # Quotes for every currency are on the same page so it should only be
+        # requested once.
+        with mock.patch.object(
+            MUFGProvider,
+            "_request",
+            side_effect=[_MockResponse(_MUFG_HTML)],
+        ):
+            quote = self.provider.get_quote("USD", "JPY", datetime.date(2024, 6, 20))
+            none_quote = self.provider.get_quote(
+                "XYZ",
+                "JPY",
+                datetime.date(2024, 6, 20),
             )
 
-            quote = provider.get_quote("USD", "JPY", datetime.date(2024, 6, 20))
-
         if quote is None:
             self.fail("quote is None")
 
@@ -89,47 +110,63 @@ class TestMUFGProvider(unittest.TestCase):
         self.assertEqual(quote.mid.units, 110)
         self.assertEqual(quote.mid.nanos, 250000000)
 
-    def test_get_quotes_none(self) -> None:
-        """Test the get_quote provider method with no data."""
+        # There is no quote for a currency that is not on the page.
+        self.assertIsNone(none_quote)
+
+    def test_get_quote_xml_declaration(self) -> None:
+        """Test a page that starts with an XML declaration."""
+        page = b'<?xml version="1.0" encoding="EUC-JP"?>\n' + _MUFG_HTML
+        with mock.patch.object(
+            MUFGProvider,
+            "_request",
+            return_value=_MockResponse(page),
+        ):
+            quote = self.provider.get_quote("USD", "JPY", datetime.date(2024, 6, 20))
+
+        if quote is None:
+            self.fail("quote is None")
+
+        self.assertEqual(quote.base_currency_code, "USD")
+        self.assertEqual(quote.mid.units, 110)
+        self.assertEqual(quote.mid.nanos, 250000000)
+
+    def test_get_quotes(self) -> None:
+        """Test the get_quotes provider method."""
         with mock.patch.object(MUFGProvider, "_request") as mocked_request:
-            mocked_request.return_value = _MockResponse(
-                """
-                <html>
-                    <head><title>Test</title></head>
-                    <body>
-                        <table class="data-table5">
-                            <tr>
-
-                                <th>Quote Currency</th>
-                                <th>Base Currency Name</th>
-                                <th>Base Currency</th>
-                                <th>Buying Rate</th>
-                                <th>Selling Rate</th>
-                                <th>Middle Rate</th>
-                            </tr>
-                            <tr>
-                                <td>JPY</td>
-                                <td>米国ドル</td>
-                                <td>USD</td>
-                                <td>109.25</td>
-                                <td>111.25</td>
-                                <td>110.25</td>
-                            </tr>
-                        </table>
-                    </body>
-                </html>
-                """.encode("euc-jp"),
+            mocked_request.return_value = _MockResponse(_MUFG_HTML)
+
+            dates = [datetime.date(2024, 6, 20 + i) for i in range(5)]
+            quotes = self.provider.get_quotes("USD", "JPY", dates)
+
+        self.assertEqual(mocked_request.call_count, len(dates))
+        self.assertEqual(
+            [(q.date.year, q.date.month, q.date.day) for q in quotes],
+            [(d.year, d.month, d.day) for d in dates],
+        )
+
+    def test_get_quote_cache_dir(self) -> None:
+        """Test that pages are cached on disk when cache_dir is set."""
+        with (
+            tempfile.TemporaryDirectory(dir=TEMP_DIR) as cache_dir,
+            mock.patch.object(MUFGProvider, "_request") as mocked_request,
+        ):
+            mocked_request.return_value = _MockResponse(_MUFG_HTML)
+            args = argparse.Namespace(**{**vars(_ARGS), "cache_dir": cache_dir})
+
+            quote = MUFGProvider(args).get_quote(
+                "USD",
+                "JPY",
+                datetime.date(2024, 6, 20),
             )
-
-            provider = MUFGProvider(
-                argparse.Namespace(
-                    logger=logging.getLogger("fx"),
-                    timeout=10,
-                    retry=0,
-                    backoff=0,
-                ),
+            cached_quote = MUFGProvider(args).get_quote(
+                "USD",
+                "JPY",
+                datetime.date(2024, 6, 20),
             )
+            # Only the page is left in the cache, with no temporary files.
+            cache_files = {p.name for p in Path(cache_dir).iterdir()}
 
-            quote = provider.get_quote("XYZ", "JPY", datetime.date(2024, 6, 20))
-
-        self.assertIsNone(quote)
+        self.assertEqual(cache_files, {"2024-06-20.html"})
+        self.assertEqual(mocked_request.call_count, 1)
+        self.assertIsNotNone(quote)
+        self.assertEqual(cached_quote, quote)
@@ -0,0 +1,59 @@
+# Copyright 2025 Ian Lewis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for provider functions."""
+
+import csv
+import io
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from fx.provider import write_providers_site
+from tests import TEMP_DIR
+
+
+class TestWriteProvidersSite(unittest.TestCase):
+    """Tests for write_providers_site."""
+
+    def test_csv_matches_csv_writer(self) -> None:
+        """Test that the CSV output matches that of csv.writer."""
+        providers = [
+            SimpleNamespace(
+                name="MUFG Bank, Ltd.",
+                code="MUFG",
+                supported_base_currencies=["USD"],
+                supported_quote_currencies=["JPY"],
+            ),
+            SimpleNamespace(
+                name='Mock "Provider"\nLine',
+                code="MOCK",
+                supported_base_currencies=[],
+                supported_quote_currencies=[],
+            ),
+        ]
+
+        f = io.StringIO()
+        w = csv.writer(f)
+        w.writerow(["name", "code"])
+        w.writerows([p.name, p.code] for p in providers)
+
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR) as tmpdir:
+            write_providers_site(tmpdir, providers, logging.getLogger(__name__))
+            self.assertEqual(
+                Path(tmpdir).joinpath("provider.csv").read_text(newline=""),
+                f.getvalue(),
+            )
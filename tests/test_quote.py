@@ -0,0 +1,159 @@
+# Copyright 2025 Ian Lewis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for quote functions."""
+
+import csv
+import io
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from fx.quote import (
+    read_quotelist_data,
+    write_quotes_csv,
+    write_quotes_data,
+)
+from fx.utils import date_msg_to_str, money_to_str
+from fx.v1.quote_pb2 import Quote, QuoteList  # type: ignore[attr-defined]
+from tests import TEMP_DIR
+
+
+class TestWriteQuotesCSV(unittest.TestCase):
+    """Tests for write_quotes_csv."""
+
+    def test_matches_csv_writer(self) -> None:
+        """Test that the output matches that of csv.DictWriter."""
+        quotes = [
+            Quote(
+                provider_code="MOCK",
+                base_currency_code="USD",
+                quote_currency_code="JPY",
+            ),
+            Quote(
+                provider_code="MOCK",
+                base_currency_code="USD",
+                quote_currency_code="JPY",
+            ),
+        ]
+        quotes[0].date.year = 2023
+        quotes[0].date.month = 1
+        quotes[0].date.day = 2
+        quotes[0].ask.units = 131
+        quotes[0].ask.nanos = 500000000
+        quotes[0].bid.units = 129
+        quotes[0].bid.nanos = 500000000
+        quotes[0].mid.units = 130
+        # The second quote has no date or amounts.
+
+        f = io.StringIO()
+        w = csv.DictWriter(
+            f,
+            fieldnames=[
+                "date",
+                "providerCode",
+                "baseCurrencyCode",
+                "quoteCurrencyCode",
+                "ask",
+                "bid",
+                "mid",
+            ],
+        )
+        w.writeheader()
+        for q in quotes:
+            w.writerow(
+                {
+                    "date": date_msg_to_str(q.date),
+                    "providerCode": q.provider_code,
+                    "baseCurrencyCode": q.base_currency_code,
+                    "quoteCurrencyCode": q.quote_currency_code,
+                    "ask": money_to_str(q.ask),
+                    "bid": money_to_str(q.bid),
+                    "mid": money_to_str(q.mid),
+                },
+            )
+
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR) as temp_dir:
+            csv_path = Path(temp_dir).joinpath("quotes.csv")
+            write_quotes_csv(
+                csv_path,
+                quotes,
+                logging.getLogger("TestWriteQuotesCSV"),
+            )
+            self.assertEqual(csv_path.read_bytes(), f.getvalue().encode())
+
+
+def _quote(day: int, mid: int) -> Quote:
+    """Return a test quote for the given day in January 2023."""
+    q = Quote(
+        provider_code="MOCK",
+        base_currency_code="USD",
+        quote_currency_code="JPY",
+    )
+    q.date.year = 2023
+    q.date.month = 1
+    q.date.day = day
+    q.mid.units = mid
+    return q
+
+
+class TestWriteQuotesData(unittest.TestCase):
+    """Tests for write_quotes_data."""
+
+    def test_merge(self) -> None:
+        """Test that new quotes are merged with and replace existing quotes."""
+        logger = logging.getLogger("TestWriteQuotesData")
+
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR) as temp_dir:
+            proto_path = Path(temp_dir).joinpath("2023.binpb")
+            write_quotes_data(proto_path, [_quote(3, 130), _quote(1, 110)], logger)
+            write_quotes_data(proto_path, [_quote(2, 120), _quote(3, 131)], logger)
+
+            qlist = read_quotelist_data(proto_path, logger)
+
+        self.assertEqual(
+            [(q.date.day, q.mid.units) for q in qlist.quotes],
+            [(1, 110), (2, 120), (3, 131)],
+        )
+
+    def test_unchanged(self) -> None:
+        """Test that the file is not rewritten if the quotes are unchanged."""
+        logger = logging.getLogger("TestWriteQuotesData")
+
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR) as temp_dir:
+            proto_path = Path(temp_dir).joinpath("2023.binpb")
+            write_quotes_data(proto_path, [_quote(1, 110), _quote(2, 120)], logger)
+            mtime_ns = proto_path.stat().st_mtime_ns
+
+            # Quotes that are not after the existing quotes are merged.
+            write_quotes_data(proto_path, [_quote(2, 120)], logger)
+
+            self.assertEqual(proto_path.stat().st_mtime_ns, mtime_ns)
+
+    def test_append(self) -> None:
+        """Test that quotes after the existing quotes are appended."""
+        logger = logging.getLogger("TestWriteQuotesData")
+
+        with tempfile.TemporaryDirectory(dir=TEMP_DIR) as temp_dir:
+            proto_path = Path(temp_dir).joinpath("2023.binpb")
+            write_quotes_data(proto_path, [_quote(1, 110), _quote(2, 120)], logger)
+            write_quotes_data(proto_path, [_quote(3, 130), _quote(4, 140)], logger)
+
+            data = proto_path.read_bytes()
+
+        expected = QuoteList(
+            quotes=[_quote(1, 110), _quote(2, 120), _quote(3, 130), _quote(4, 140)],
+        )
+        self.assertEqual(data, expected.SerializeToString())
@@ -23,76 +23,38 @@ from pathlib import Path
 from unittest import mock
 
 from fx.update import update_command
+from tests import TEMP_DIR
 from tests.mock_provider import MockProvider
 
+# The logger is shared by the tests so that its handler is only added once.
+_LOGGER = logging.getLogger("TestUpdateCommand")
+_LOGGER.addHandler(logging.NullHandler())
+
 
 class TestUpdateCommand(unittest.TestCase):
     """Tests for the update_command function."""
 
     def setUp(self) -> None:
         """Set up the test case."""
-        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_dir = tempfile.TemporaryDirectory(dir=TEMP_DIR)
+        self.args = argparse.Namespace(
+            logger=_LOGGER,
+            data_dir=self.temp_dir.name,
+            start=datetime.date(2024, 1, 1),
+            end=datetime.date(2024, 1, 1),
+            provider=[MockProvider],
+            timeout=10,
+            retry=0,
+            backoff=0,
+        )
 
     def tearDown(self) -> None:
         """Tear down the test case."""
         self.temp_dir.cleanup()
 
-    @unittest.mock.patch("urllib3.PoolManager")
-    def test_update_command(self, mock_pool_manager: mock.MagicMock) -> None:
+    def test_update_command(self) -> None:
         """Test the update_command function."""
-        mock_currencies_response = unittest.mock.Mock()
-        mock_currencies_response.status = 200
-        mock_currencies_response.data = (
-            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
-            b'<ISO_4217 Pblshd="2025-05-12">'
-            b"    <CcyTbl>"
-            b"        <CcyNtry>"
-            b"            <CtryNm>UNITED STATES OF AMERICA (THE)</CtryNm>"
-            b"            <CcyNm>US Dollar</CcyNm>"
-            b"            <Ccy>USD</Ccy>"
-            b"            <CcyNbr>840</CcyNbr>"
-            b"            <CcyMnrUnts>2</CcyMnrUnts>"
-            b"        </CcyNtry>"
-            b"        <CcyNtry>"
-            b"            <CtryNm>JAPAN</CtryNm>"
-            b"            <CcyNm>Yen</CcyNm>"
-            b"            <Ccy>JPY</Ccy>"
-            b"            <CcyNbr>392</CcyNbr>"
-            b"            <CcyMnrUnts>0</CcyMnrUnts>"
-            b"        </CcyNtry>"
-            b"    </CcyTbl>"
-            b"</ISO_4217>"
-        )
-
-        mock_historic_response = unittest.mock.Mock()
-        mock_historic_response.status = 200
-        mock_historic_response.data = (
-            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
-            b'<ISO_4217 Pblshd="2025-03-31">'
-            b"<HstrcCcyTbl></HstrcCcyTbl>"
-            b"</ISO_4217>"
-        )
-
-        mock_pool_manager.return_value.request.side_effect = [
-            mock_currencies_response,
-            mock_historic_response,
-        ]
-
-        logger = logging.getLogger("TestUpdateCommand")
-        logger.addHandler(logging.NullHandler())
-
-        update_command(
-            argparse.Namespace(
-                logger=logger,
-                data_dir=self.temp_dir.name,
-                start=datetime.date(2024, 1, 1),
-                end=datetime.date(2024, 1, 1),
-                provider=[MockProvider],
-                timeout=10,
-                retry=0,
-                backoff=0,
-            ),
-        )
+        update_command(self.args)
 
         self.assertTrue(
             Path(self.temp_dir.name)
@@ -105,3 +67,10 @@ class TestUpdateCommand(unittest.TestCase):
             .joinpath("MOCK", "EUR", "JPY", "2024.binpb")
             .is_file(),
         )
+
+    def test_update_command_no_quotes(self) -> None:
+        """Test that data files are not written when there are no quotes."""
+        with mock.patch.object(MockProvider, "get_quote", return_value=None):
+            update_command(self.args)
+
+        self.assertFalse(Path(self.temp_dir.name).joinpath("MOCK").exists())
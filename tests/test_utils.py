@@ -0,0 +1,153 @@
+# Copyright 2025 Ian Lewis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for utility functions."""
+
+import datetime
+import unittest
+
+from dateutil.relativedelta import relativedelta
+from google.type.date_pb2 import Date
+from google.type.money_pb2 import Money
+
+from fx.utils import date_iterator, date_msg_to_str, money_to_str, str_to_money
+
+
+class TestStrToMoney(unittest.TestCase):
+    """Tests for str_to_money."""
+
+    def test_valid(self) -> None:
+        """Test parsing valid amounts."""
+        for s, units, nanos in [
+            ("110", 110, 0),
+            ("110.", 110, 0),
+            ("110.25", 110, 250000000),
+            ("0.000000001", 0, 1),
+            # Digits beyond nanosecond precision are truncated.
+            ("1.1234567891", 1, 123456789),
+            # Negative amounts have negative nanos.
+            ("-1.5", -1, -500000000),
+        ]:
+            with self.subTest(s=s):
+                self.assertEqual(
+                    str_to_money("JPY", s),
+                    Money(currency_code="JPY", units=units, nanos=nanos),
+                )
+
+    def test_invalid(self) -> None:
+        """Test that invalid amounts raise ValueError."""
+        for s in ["", "abc", ".5", "1.2.3", "1.-5", "110.25 ", "78.56  ", "1.2a"]:
+            with self.subTest(s=s), self.assertRaises(ValueError):
+                str_to_money("JPY", s)
+
+
+class TestMoneyToStr(unittest.TestCase):
+    """Tests for money_to_str."""
+
+    def test_money_to_str(self) -> None:
+        """Test formatting amounts."""
+        for m, expected in [
+            (Money(), None),
+            (Money(currency_code="JPY"), "0."),
+            (Money(currency_code="JPY", units=130), "130."),
+            (Money(currency_code="JPY", units=131, nanos=500000000), "131.5"),
+            (Money(currency_code="JPY", units=-1, nanos=-500000000), "-1.5"),
+            (Money(currency_code="JPY", nanos=1), "0.000000001"),
+        ]:
+            with self.subTest(m=m):
+                self.assertEqual(money_to_str(m), expected)
+
+
+class TestDateMsgToStr(unittest.TestCase):
+    """Tests for date_msg_to_str."""
+
+    def test_date_msg_to_str(self) -> None:
+        """Test formatting full and partial dates."""
+        for d, expected in [
+            (Date(), None),
+            (Date(year=2023), "2023"),
+            (Date(year=2023, month=1), "2023/01"),
+            (Date(year=2023, month=1, day=2), "2023/01/02"),
+        ]:
+            with self.subTest(d=d):
+                self.assertEqual(date_msg_to_str(d), expected)
+
+    def test_invalid(self) -> None:
+        """Test that a day without a month raises ValueError."""
+        with self.assertRaises(ValueError):
+            date_msg_to_str(Date(year=2023, day=2))
+
+
+class TestDateIterator(unittest.TestCase):
+    """Tests for date_iterator."""
+
+    def test_days(self) -> None:
+        """Test iterating by days across a month end."""
+        self.assertEqual(
+            list(
+                date_iterator(
+                    datetime.date(2024, 2, 27),
+                    datetime.date(2024, 3, 1),
+                ),
+            ),
+            [
+                datetime.date(2024, 2, 27),
+                datetime.date(2024, 2, 28),
+                datetime.date(2024, 2, 29),
+                datetime.date(2024, 3, 1),
+            ],
+        )
+
+    def test_step(self) -> None:
+        """Test iterating with steps of days and of months."""
+        self.assertEqual(
+            list(
+                date_iterator(
+                    datetime.date(2024, 1, 1),
+                    datetime.date(2024, 1, 20),
+                    relativedelta(days=7),
+                ),
+            ),
+            [
+                datetime.date(2024, 1, 1),
+                datetime.date(2024, 1, 8),
+                datetime.date(2024, 1, 15),
+            ],
+        )
+        self.assertEqual(
+            list(
+                date_iterator(
+                    datetime.date(2024, 1, 15),
+                    datetime.date(2024, 3, 31),
+                    relativedelta(months=1),
+                ),
+            ),
+            [
+                datetime.date(2024, 1, 15),
+                datetime.date(2024, 2, 15),
+                datetime.date(2024, 3, 15),
+            ],
+        )
+
+    def test_empty(self) -> None:
+        """Test that no dates are returned if the end is before the start."""
+        self.assertEqual(
+            list(
+                date_iterator(
+                    datetime.date(2024, 1, 2),
+                    datetime.date(2024, 1, 1),
+                ),
+            ),
+            [],
+        )